@@ -0,0 +1,349 @@
+import heapq
+import io
+import json
+import random
+
+import pytest
+
+from main import (
+    GENERATORS,
+    ClusterIndex,
+    IncrementalSolver,
+    Maze,
+    MazeFile,
+    MazeGrid,
+    MazeIndex,
+    check_rows,
+    every_nth_step,
+    generate_and_solve_many,
+    generate_tiled,
+    main,
+    maze_rows,
+    read_rows,
+    read_steps,
+    record_steps,
+    run_job,
+    run_steps,
+    save_maze,
+    save_rows,
+    write_rows,
+)
+
+
+def _maze(rows, cols, seed, generator="dfs", braid=0.0, max_cost=1) -> Maze:
+    maze = Maze(
+        0,
+        0,
+        rows,
+        cols,
+        0,
+        0,
+        seed=seed,
+        generator=generator,
+        braid=braid,
+        max_cost=max_cost,
+    )
+    maze.generate()
+    return maze
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_carve_dfs_matches_break_walls_r(seed):
+    old = Maze(0, 0, 15, 17, 0, 0, seed=seed)
+    old._break_walls_r(0, 0)
+    new = Maze(0, 0, 15, 17, 0, 0, seed=seed)
+    run_steps(new.grid.carve_dfs_steps())
+    assert new.grid.walls == old.grid.walls
+
+
+def _assert_walkable(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (i, j), (i_, j_) in zip(path, path[1:]):
+        assert abs(i - i_) + abs(j - j_) == 1
+        assert not grid.has_wall_blocking(i, j, i_, j_)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bfs_path_is_shortest(seed):
+    grid = _maze(18, 25, seed, braid=0.5).grid
+    rng = random.Random(seed)
+    for _ in range(20):
+        a = (rng.randrange(18), rng.randrange(25))
+        b = (rng.randrange(18), rng.randrange(25))
+        path, visited = grid.bfs_path(a, b)
+        _assert_walkable(grid, path, a, b)
+        assert 1 <= visited <= 18 * 25
+        # shortest both ways, whatever the early exit saw
+        assert len(grid.bfs_path(b, a)[0]) == len(path)
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+def test_dfs_and_wall_follower_find_the_perfect_maze_path(generator):
+    grid = _maze(21, 34, 5, generator).grid
+    expected, _ = grid.bfs_path()
+    # a perfect maze has one path, every solver must find it
+    assert grid.dfs_path()[0] == expected
+    assert grid.wall_follower_path()[0] == expected
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+@pytest.mark.parametrize("braid", [0.0, 0.5])
+def test_astar_and_bidirectional_bfs_are_shortest(generator, braid):
+    grid = _maze(21, 34, 5, generator, braid).grid
+    rng = random.Random(braid)
+    for _ in range(20):
+        a = (rng.randrange(21), rng.randrange(34))
+        b = (rng.randrange(21), rng.randrange(34))
+        expected, _ = grid.bfs_path(a, b)
+        for solve in (grid.astar_path, grid.bidirectional_bfs_path):
+            path, _ = solve(a, b)
+            _assert_walkable(grid, path, a, b)
+            assert len(path) == len(expected)
+
+
+@pytest.mark.parametrize("generator", ["dfs", "kruskal", "eller"])
+def test_maze_index_matches_bfs(generator):
+    grid = _maze(23, 19, 6, generator).grid
+    index = MazeIndex(grid)
+    rng = random.Random(6)
+    for _ in range(50):
+        a = (rng.randrange(23), rng.randrange(19))
+        b = (rng.randrange(23), rng.randrange(19))
+        expected, _ = grid.bfs_path(a, b)
+        assert index.path(a, b) == expected
+        assert index.distance(a, b) == len(expected) - 1
+
+
+@pytest.mark.parametrize("algo", ["dfs", "bfs", "wall_follower", "astar"])
+def test_step_streams_record_and_replay(algo):
+    maze = _maze(12, 14, 3)
+    f = io.BytesIO()
+    result = run_steps(record_steps(maze.solve_steps(algo), f))
+    assert result == getattr(maze.grid, f"{algo}_path")()
+    f.seek(0)
+    replayed = list(read_steps(f))
+    assert len(f.getvalue()) == 9 * len(replayed)
+    assert replayed == list(maze.solve_steps(algo))
+    # sampling keeps every n-th step and the stream's result
+    sampled = every_nth_step(maze.solve_steps(algo), 3)
+    assert list(sampled) == replayed[2::3]
+    assert run_steps(every_nth_step(maze.solve_steps(algo), 3)) == result
+
+
+def test_generate_steps_carve_the_generated_maze():
+    carved = Maze(0, 0, 9, 11, 0, 0, seed=8)
+    steps = list(carved.generate_steps())
+    assert len(steps) == 9 * 11 - 1
+    assert {op for op, _, _ in steps} == {"carve"}
+    assert carved.grid.walls == _maze(9, 11, 8).grid.walls
+
+
+@pytest.mark.parametrize("generator", ["binary_tree", "sidewinder", "eller"])
+def test_maze_rows_match_maze_walls(generator):
+    rows = b"".join(maze_rows(30, 23, generator, seed=9))
+    assert rows == _maze(30, 23, 9, generator).grid.walls
+    f = io.BytesIO()
+    write_rows(maze_rows(30, 23, generator, seed=9), f)
+    f.seek(0)
+    assert b"".join(read_rows(f, 23)) == rows
+    stats = check_rows(read_rows(io.BytesIO(f.getvalue()), 23))
+    assert stats["connected"] and stats["perfect"]
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+def test_maze_file_round_trip(generator):
+    maze = _maze(19, 26, 4, generator)
+    f = io.BytesIO()
+    maze.save(f)
+    with MazeFile(f.getvalue()) as mf:
+        assert (mf.rows, mf.cols, mf.seed, mf.generator) == (19, 26, 4, generator)
+        assert bytes(mf.grid(copy=True).walls) == maze.grid.walls
+        assert [mf.walls[v] for v in range(19 * 26)] == list(maze.grid.walls)
+        assert mf.grid().bfs_path() == maze.grid.bfs_path()
+
+    streamed = io.BytesIO()
+    save_rows(maze_rows(19, 26, "eller", seed=4), streamed, 19, 26, 4, "eller")
+    saved = io.BytesIO()
+    save_maze(_maze(19, 26, 4, "eller").grid, saved, 4, "eller")
+    assert streamed.getvalue() == saved.getvalue()
+
+
+def test_batch_command_writes_one_record_per_seed(tmp_path):
+    out = tmp_path / "results.jsonl"
+    main(
+        [
+            "batch",
+            "--rows",
+            "12",
+            "--cols",
+            "15",
+            "--solver",
+            "astar",
+            "--seeds",
+            "1,4..5",
+            "-o",
+            str(out),
+        ]
+    )
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["seed"] for r in records] == [1, 4, 5]
+    for record in records:
+        expected = run_job(12, 15, record["seed"], "dfs", "astar")
+        for key in ("path_length", "path_cost", "cells_visited", "generator"):
+            assert record[key] == expected[key]
+
+
+def test_generate_and_solve_many_is_the_same_for_any_workers():
+    configs = [
+        {"rows": 20, "cols": 20, "seed": seed, "generator": gen, "solver": "bfs"}
+        for seed in range(6)
+        for gen in ("dfs", "wilson")
+    ]
+    timings = ("generate_seconds", "solve_seconds")
+
+    def strip(records):
+        return [{k: v for k, v in r.items() if k not in timings} for r in records]
+
+    serial = generate_and_solve_many(configs, workers=1)
+    parallel = generate_and_solve_many(configs, workers=2)
+    assert strip(serial) == strip(parallel)
+    assert [r["seed"] for r in serial] == [c["seed"] for c in configs]
+
+
+@pytest.mark.parametrize("generator", GENERATORS)
+def test_tremaux_pledge_and_dead_end_filling(generator):
+    grid = _maze(21, 34, 5, generator).grid
+    expected, _ = grid.bfs_path()
+    for solve in (grid.tremaux_path, grid.pledge_path, grid.dead_end_filling_path):
+        assert solve()[0] == expected
+    braided = _maze(21, 34, 5, generator, braid=0.5).grid
+    goal = (20, 33)
+    for solve in (braided.tremaux_path, braided.pledge_path):
+        path, _ = solve()
+        _assert_walkable(braided, path, (0, 0), goal)
+    shortest = len(braided.bfs_path()[0])
+    assert len(braided.dead_end_filling_path()[0]) == shortest
+
+
+def _cheapest(grid, start, goal):
+    # plain heap dijkstra over has_wall_blocking, the reference
+    cols = grid.cols
+    dist = {start: 0}
+    heap = [(0, start)]
+    while heap:
+        d, (i, j) = heapq.heappop(heap)
+        if (i, j) == goal:
+            return d
+        if d > dist[(i, j)]:
+            continue
+        for i_, j_ in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+            if not grid.is_valid_cell(i_, j_) or grid.has_wall_blocking(i, j, i_, j_):
+                continue
+            nd = d + grid.cost[i_ * cols + j_]
+            if nd < dist.get((i_, j_), nd + 1):
+                dist[(i_, j_)] = nd
+                heapq.heappush(heap, (nd, (i_, j_)))
+    return -1
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_dijkstra_finds_the_cheapest_path(seed):
+    grid = _maze(16, 21, seed, "wilson", braid=0.7, max_cost=9).grid
+    path, _ = grid.dijkstra_path()
+    _assert_walkable(grid, path, (0, 0), (15, 20))
+    # the start cell is free, every cell stepped into costs
+    assert grid.path_cost(path) == _cheapest(grid, (0, 0), (15, 20))
+
+
+def test_braid_removes_dead_ends():
+    perfect = check_rows(_rows(_maze(30, 30, 1).grid))
+    braided = check_rows(_rows(_maze(30, 30, 1, braid=1.0).grid))
+    assert braided["connected"] and not braided["perfect"]
+    assert braided["dead_ends"] < perfect["dead_ends"] // 10
+
+
+def _rows(grid):
+    walls = bytes(grid.walls)
+    return [walls[i * grid.cols : (i + 1) * grid.cols] for i in range(grid.rows)]
+
+
+def _stitched(tiled) -> MazeGrid:
+    walls = bytearray(b"".join(tiled.iter_rows()))
+    return MazeGrid(tiled.rows, tiled.cols, walls)
+
+
+@pytest.mark.parametrize(
+    "rows, cols, tile_size",
+    [(20, 3, 6), (300, 100, 100), (3, 20, 6), (30, 40, 8)],
+)
+def test_tiled_path_matches_stitched_bfs(tmp_path, rows, cols, tile_size):
+    # (20, 3, 6) and (300, 100, 100) have a single column of tiles
+    tiled = generate_tiled(str(tmp_path), rows, cols, 7, "dfs", tile_size)
+    stats = check_rows(tiled.iter_rows())
+    assert stats["connected"] and stats["perfect"]
+    grid = _stitched(tiled)
+    pairs = [((0, 0), (rows - 1, cols - 1)), ((rows // 2, 0), (rows - 2, cols - 1))]
+    for start, goal in pairs:
+        path, _ = tiled.path(start, goal)
+        expected, _ = grid.bfs_path(start, goal)
+        assert path == expected
+
+
+@pytest.mark.parametrize("braid", [0.0, 0.5])
+@pytest.mark.parametrize("cluster_size", [4, 7, 16])
+def test_cluster_index_is_exact(braid, cluster_size):
+    grid = _maze(40, 29, 2, "kruskal", braid).grid
+    index = ClusterIndex(grid, cluster_size)
+    f = io.BytesIO()
+    index.save(f)
+    f.seek(0)
+    loaded = ClusterIndex.load(f, grid)
+    rng = random.Random(cluster_size)
+    for _ in range(100):
+        a = (rng.randrange(40), rng.randrange(29))
+        b = (rng.randrange(40), rng.randrange(29))
+        expected, _ = grid.bfs_path(a, b)
+        path = loaded.path(a, b)
+        assert len(path) == len(expected)
+        _assert_walkable(grid, path, a, b)
+        assert index.distance(a, b) == len(expected) - 1
+
+
+def test_cluster_index_rejects_other_maze():
+    f = io.BytesIO()
+    ClusterIndex(_maze(10, 10, 1).grid).save(f)
+    f.seek(0)
+    with pytest.raises(ValueError):
+        ClusterIndex.load(f, _maze(10, 10, 2).grid)
+
+
+@pytest.mark.parametrize("max_cost", [1, 5])
+def test_incremental_solver_matches_dijkstra_after_edits(max_cost):
+    grid = _maze(17, 23, 3, "wilson", 0.3, max_cost).grid
+    solver = IncrementalSolver(grid)
+    rng = random.Random(max_cost)
+    for _ in range(150):
+        i, j = rng.randrange(16), rng.randrange(22)
+        if rng.random() < 0.5:
+            solver.toggle_wall(i, j, i + 1, j)
+        else:
+            solver.toggle_wall(i, j, i, j + 1)
+        path, _ = solver.solve()
+        expected, _ = grid.dijkstra_path()
+        assert bool(path) == bool(expected)
+        if path:
+            assert grid.path_cost(path) == grid.path_cost(expected)
+            _assert_walkable(grid, path, (0, 0), (16, 22))
+    # edits keep the cached neighbor table in sync with the walls
+    fresh = MazeGrid(grid.rows, grid.cols, bytearray(grid.walls))
+    assert grid.neighbor_table()[0] == fresh.neighbor_table()[0]
+
+
+def test_wall_edits_make_indexes_out_of_date():
+    grid = _maze(12, 12, 4).grid
+    cluster = ClusterIndex(grid, 4)
+    tree = MazeIndex(grid)
+    grid.set_wall(5, 5, 5, 6, closed=not grid.has_wall_blocking(5, 5, 5, 6))
+    for query in (cluster.path, cluster.distance, tree.path, tree.distance):
+        with pytest.raises(ValueError, match="out of date"):
+            query((0, 0), (11, 11))